@@ -16,17 +16,39 @@ Commands:
 """
 
 import argparse
+import contextlib
+import functools
+import importlib
+import io
 import json
 import os
+import re
 import shutil
+import signal
 import subprocess
 import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from logging.handlers import RotatingFileHandler
+from logging.handlers import MemoryHandler, RotatingFileHandler
 import logging
 
+try:
+    import orjson
+
+    _loads = orjson.loads
+
+    def _dumps(data):
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+except ImportError:
+    # stdlib json also accepts bytes directly, skipping a separate decode step
+    _loads = json.loads
+
+    def _dumps(data):
+        return json.dumps(data, indent=2).encode("utf-8")
+
 ROOT = Path(__file__).resolve().parent
 TOOLS_DIR = ROOT / "tools"
 MEMORY_DIR = ROOT / "memory"
@@ -47,26 +69,53 @@ logger.setLevel(logging.DEBUG)
 logfile = LOG_DIR / "anyproject.log"
 handler = RotatingFileHandler(logfile, maxBytes=2_000_000, backupCount=5)
 handler.setFormatter(logging.Formatter("%(asctime)s [%(levelname)s] %(message)s"))
-logger.addHandler(handler)
+handler.setLevel(logging.DEBUG)
+# buffer file records and write them in bulk; errors still flush immediately
+mem_handler = MemoryHandler(capacity=512, flushLevel=logging.ERROR, target=handler, flushOnClose=True)
+logger.addHandler(mem_handler)
 ch = logging.StreamHandler()
+ch.setLevel(logging.INFO)
 ch.setFormatter(logging.Formatter("[%(levelname)s] %(message)s"))
 logger.addHandler(ch)
 
+
+def _flush_logs_on_sigterm(signum, frame):
+    """Write buffered log records, then die from SIGTERM as if no handler were set.
+
+    Re-raising the signal (rather than sys.exit) means an in-process tool's
+    `except SystemExit` in _run_tool can't swallow the termination.
+    """
+    mem_handler.flush()
+    signal.signal(signum, signal.SIG_DFL)
+    os.kill(os.getpid(), signum)
+
 # exit codes
 EXIT_OK = 0
 EXIT_FAIL = 2
 
+# run tools/*.py as separate interpreters instead of in-process (--subprocess)
+RUN_TOOLS_IN_SUBPROCESS = False
+# tools that spawn their own children (venv, pip): in-process capture can't see
+# the children's output, so these always run as a subprocess
+_SUBPROCESS_TOOLS = {"bootstrap"}
+_tool_lock = threading.Lock()
+
+# markers that flag a seed file as an unedited template
+_PLACEHOLDER_RE = re.compile(rb"todo|example|describe|placeholder", re.IGNORECASE)
+# vector_store --count prints "vectors: N"
+_COUNT_RE = re.compile(r"vectors[^0-9]*(\d+)", re.IGNORECASE)
+
 # Utility helpers
 
 
-def run_subprocess(cmd, cwd=None, capture=False, check=False):
+def run_subprocess(cmd, cwd=None, capture=False, check=False, timeout=None):
     """Run subprocess and handle errors; return (returncode, stdout)."""
     try:
         if capture:
-            res = subprocess.run(cmd, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+            res = subprocess.run(cmd, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, timeout=timeout)
             return res.returncode, res.stdout.strip() + ("\n" + res.stderr.strip() if res.stderr else "")
         else:
-            res = subprocess.run(cmd, cwd=cwd)
+            res = subprocess.run(cmd, cwd=cwd, timeout=timeout)
             return res.returncode, ""
     except FileNotFoundError:
         logger.error(f"Command not found: {cmd[0]}")
@@ -76,28 +125,97 @@ def run_subprocess(cmd, cwd=None, capture=False, check=False):
         return 1, str(e)
 
 
+def _run_tool(module_name, argv=(), entry="main"):
+    """Run tools/<module_name>.py in-process via its entry function; return (returncode, output).
+
+    Avoids an interpreter start-up per tool call. Modules stay cached in
+    sys.modules, so repeat calls (e.g. during init) reuse them. Falls back to a
+    subprocess when RUN_TOOLS_IN_SUBPROCESS is set (--subprocess) and for
+    _SUBPROCESS_TOOLS.
+
+    In-process capture swaps sys.stdout/sys.stderr only: output of child
+    processes the tool starts is not captured, and print() from other threads
+    while the tool runs lands in its output. Logging handlers keep their own
+    streams and are unaffected.
+    """
+    if RUN_TOOLS_IN_SUBPROCESS or module_name in _SUBPROCESS_TOOLS:
+        return run_subprocess([sys.executable, str(TOOLS_DIR / f"{module_name}.py"), *argv], capture=True)
+    if str(ROOT) not in sys.path:
+        sys.path.insert(0, str(ROOT))
+    buf = io.StringIO()
+    # sys.argv and stdout are process-wide, so only one in-process tool runs at a time
+    with _tool_lock:
+        old_argv = sys.argv
+        sys.argv = [module_name, *argv]
+        try:
+            with contextlib.redirect_stdout(buf), contextlib.redirect_stderr(buf):
+                mod = importlib.import_module(f"tools.{module_name}")
+                rc = getattr(mod, entry)() or 0
+        except SystemExit as e:
+            rc = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+        except Exception as e:
+            logger.exception(f"Exception running tool {module_name}: {e}")
+            rc = 1
+        finally:
+            sys.argv = old_argv
+    return rc, buf.getvalue().strip()
+
+
+@functools.lru_cache(maxsize=8)
+def _which_on_path(cmd, path):
+    return shutil.which(cmd, path=path)
+
+
+def _which(cmd):
+    """shutil.which() memoized per PATH value, so PATH is walked once per process."""
+    return _which_on_path(cmd, os.environ.get("PATH", ""))
+
+
+def _ensure_adb_server():
+    """Start the adb daemon so later adb calls skip its slow spin-up (no-op if it's running)."""
+    if not _which("adb"):
+        return
+    rc, out = run_subprocess(["adb", "start-server"], capture=True, timeout=5)
+    if rc != 0:
+        logger.warning(f"adb start-server failed: {out}")
+
+
+_memory_dirs_ready = False
+
+
 def ensure_memory_dirs():
+    """Create memory/vector/batch dirs; runs once per process (every command calls it)."""
+    global _memory_dirs_ready
+    if _memory_dirs_ready:
+        return
     MEMORY_DIR.mkdir(parents=True, exist_ok=True)
     VECTOR_DIR.mkdir(parents=True, exist_ok=True)
     BATCH_DIR.mkdir(parents=True, exist_ok=True)
+    _memory_dirs_ready = True
 
 
 def load_json_safe(path):
     if not path.exists():
         return None
     try:
-        return json.loads(path.read_text(encoding="utf-8"))
+        return _loads(path.read_bytes())
     except Exception:
         logger.warning(f"Failed to parse JSON at {path}, returning None")
         return None
 
 
+def _atomic_write_json(path: Path, data):
+    """Serialize data and swap it into place so readers never see a partial file."""
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_bytes(_dumps(data))
+    os.replace(tmp, path)
+
+
 def write_json_safe(path: Path, data, merge=False):
     if merge and path.exists():
         existing = load_json_safe(path) or {}
         if isinstance(existing, dict) and isinstance(data, dict):
-            merged = {**existing, **data}
-            path.write_text(json.dumps(merged, indent=2), encoding="utf-8")
+            _atomic_write_json(path, {**existing, **data})
             return
         if isinstance(existing, list) and isinstance(data, list):
             # append unique by id if present
@@ -105,37 +223,38 @@ def write_json_safe(path: Path, data, merge=False):
             for item in data:
                 if isinstance(item, dict) and item.get("id") not in existing_ids:
                     existing.append(item)
-            path.write_text(json.dumps(existing, indent=2), encoding="utf-8")
+            _atomic_write_json(path, existing)
             return
-    path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+    _atomic_write_json(path, data)
 
 
 def is_placeholder_json(path: Path):
     """Detect if JSON is placeholder/empty."""
-    if not path.exists():
+    try:
+        data = path.read_bytes().strip()
+    except OSError:
+        return True
+    if data == b"" or data == b"{}":
         return True
     try:
-        text = path.read_text(encoding="utf-8").strip()
-        if text == "" or text == "{}":
-            return True
-        lower = text.lower()
-        for marker in ["todo", "example", "describe", "placeholder"]:
-            if marker in lower:
-                return True
-        # also check if no meaningful keys
-        obj = json.loads(text)
-        if isinstance(obj, dict) and not obj.get("features") and not obj.get("project_name") and not obj.get("name"):
-            return True
-        return False
+        obj = _loads(data)
     except Exception:
         return True
+    # single case-insensitive pass over raw bytes for all markers
+    if _PLACEHOLDER_RE.search(data):
+        return True
+    # also check if no meaningful keys
+    if isinstance(obj, dict) and not obj.get("features") and not obj.get("project_name") and not obj.get("name"):
+        return True
+    return False
 
 
 def is_placeholder_md(path: Path):
-    if not path.exists():
+    try:
+        txt = path.read_bytes().strip().lower()
+    except OSError:
         return True
-    txt = path.read_text(encoding="utf-8").strip().lower()
-    if txt == "" or txt.startswith("# research guidelines") or any(m in txt for m in ["todo", "example", "describe"]):
+    if txt == b"" or txt.startswith(b"# research guidelines") or any(m in txt for m in [b"todo", b"example", b"describe"]):
         return True
     return False
 
@@ -159,7 +278,7 @@ def cmd_validate(args):
     if not validate_script.exists():
         logger.error("validate_repo.py not found in tools/")
         return EXIT_FAIL
-    rc, out = run_subprocess([sys.executable, str(validate_script)], capture=True)
+    rc, out = _run_tool("validate_repo")
     if rc != 0:
         logger.error("validate_repo failed:\n" + out)
         return EXIT_FAIL
@@ -173,7 +292,7 @@ def cmd_bootstrap(args):
     if not bootstrap_script.exists():
         logger.error("bootstrap.py not found in tools/")
         return EXIT_FAIL
-    rc, out = run_subprocess([sys.executable, str(bootstrap_script)], capture=True)
+    rc, out = _run_tool("bootstrap")
     if rc != 0:
         logger.error("bootstrap failed:\n" + out)
         return EXIT_FAIL
@@ -203,15 +322,19 @@ def cmd_init(args):
         RESEARCH_FILE.write_text("# Research Guidelines\n\n", encoding="utf-8")
 
     # prompt editing if placeholders
-    while is_placeholder_json(FEATURES_FILE) or is_placeholder_md(RESEARCH_FILE):
-        if is_placeholder_json(FEATURES_FILE):
+    while True:
+        features_placeholder = is_placeholder_json(FEATURES_FILE)
+        research_placeholder = is_placeholder_md(RESEARCH_FILE)
+        if not (features_placeholder or research_placeholder):
+            break
+        if features_placeholder:
             logger.warning("PROGRAM_FEATURES.json appears to be a template/placeholder.")
             if args.edit_missing:
                 prompt_edit(FEATURES_FILE)
             else:
                 logger.info("Run 'anyProject.py edit-features' or re-run init with --edit-missing to edit now.")
                 return EXIT_FAIL
-        if is_placeholder_md(RESEARCH_FILE):
+        if research_placeholder:
             logger.warning("RESEARCH_GUIDELINES.md appears to be a template/placeholder.")
             if args.edit_missing:
                 prompt_edit(RESEARCH_FILE)
@@ -223,10 +346,13 @@ def cmd_init(args):
     if cmd_bootstrap(args) != EXIT_OK:
         return EXIT_FAIL
 
+    # pre-warm adb so later doctor/debug runs find the daemon already running
+    _ensure_adb_server()
+
     # seed vector DB & memory via tools/sync_memory.py if present, else call vector_store directly via CLI
     sync_script = TOOLS_DIR / "sync_memory.py"
     if sync_script.exists():
-        rc, out = run_subprocess([sys.executable, str(sync_script)], capture=True)
+        rc, out = _run_tool("sync_memory", entry="sync")
         if rc != 0:
             logger.error("sync_memory failed:\n" + out)
             return EXIT_FAIL
@@ -235,11 +361,11 @@ def cmd_init(args):
         # attempt vector_store.py --ingest-source for both files
         vs = TOOLS_DIR / "vector_store.py"
         if vs.exists():
-            rc, out = run_subprocess([sys.executable, str(vs), "--ingest-source", "PROGRAM_FEATURES", str(FEATURES_FILE)], capture=True)
+            rc, out = _run_tool("vector_store", ["--ingest-source", "PROGRAM_FEATURES", str(FEATURES_FILE)])
             if rc != 0:
                 logger.error("vector_store ingest PROGRAM_FEATURES failed:\n" + out)
                 return EXIT_FAIL
-            rc, out = run_subprocess([sys.executable, str(vs), "--ingest-source", "RESEARCH_GUIDELINES", str(RESEARCH_FILE)], capture=True)
+            rc, out = _run_tool("vector_store", ["--ingest-source", "RESEARCH_GUIDELINES", str(RESEARCH_FILE)])
             if rc != 0:
                 logger.error("vector_store ingest RESEARCH_GUIDELINES failed:\n" + out)
                 return EXIT_FAIL
@@ -263,7 +389,7 @@ def cmd_sync(args):
     ensure_memory_dirs()
     sync_script = TOOLS_DIR / "sync_memory.py"
     if sync_script.exists():
-        rc, out = run_subprocess([sys.executable, str(sync_script)], capture=True)
+        rc, out = _run_tool("sync_memory", entry="sync")
         if rc != 0:
             logger.error("sync failed:\n" + out)
             return EXIT_FAIL
@@ -272,11 +398,11 @@ def cmd_sync(args):
     # fallback: try vector_store CLI options
     vs = TOOLS_DIR / "vector_store.py"
     if vs.exists():
-        rc, out = run_subprocess([sys.executable, str(vs), "--ingest-source", "PROGRAM_FEATURES", str(FEATURES_FILE)], capture=True)
+        rc, out = _run_tool("vector_store", ["--ingest-source", "PROGRAM_FEATURES", str(FEATURES_FILE)])
         if rc != 0:
             logger.error("vector_store ingest PROGRAM_FEATURES failed:\n" + out)
             return EXIT_FAIL
-        rc, out = run_subprocess([sys.executable, str(vs), "--ingest-source", "RESEARCH_GUIDELINES", str(RESEARCH_FILE)], capture=True)
+        rc, out = _run_tool("vector_store", ["--ingest-source", "RESEARCH_GUIDELINES", str(RESEARCH_FILE)])
         if rc != 0:
             logger.error("vector_store ingest RESEARCH_GUIDELINES failed:\n" + out)
             return EXIT_FAIL
@@ -295,7 +421,9 @@ def cmd_plan(args):
         return EXIT_FAIL
 
     # build simple plan: one task per feature key or item
-    plan = {"generated_at": datetime.utcnow().isoformat() + "Z", "tasks": []}
+    # every task in one plan run shares the same creation instant
+    now_iso = datetime.utcnow().isoformat() + "Z"
+    plan = {"generated_at": now_iso, "tasks": []}
     # features can be dict or list
     features = pf.get("features")
     if isinstance(features, dict):
@@ -320,7 +448,7 @@ def cmd_plan(args):
             "title": it.get("title"),
             "description": json.dumps(it.get("details")) if isinstance(it.get("details"), dict) else str(it.get("details")),
             "status": "pending",
-            "created_at": datetime.utcnow().isoformat() + "Z",
+            "created_at": now_iso,
         }
         plan["tasks"].append(task)
 
@@ -362,7 +490,8 @@ def cmd_scaffold(args):
     # mark in state
     st = load_json_safe(STATE_FILE) or {}
     st["last_scaffold"] = {"platform": platform, "time": datetime.utcnow().isoformat() + "Z"}
-    write_json_safe(STATE_FILE, st, merge=True)
+    # st already holds the loaded state, so write it as-is instead of re-merging
+    write_json_safe(STATE_FILE, st)
     return EXIT_OK
 
 
@@ -379,19 +508,22 @@ def cmd_codegen(args):
     delay = args.delay or 0  # seconds between batches, used to throttle if needed
 
     batches = [pending[i:i + batch_size] for i in range(0, len(pending), batch_size)]
+    # index tasks by id once so marking a batch is O(batch) rather than O(batch * tasks)
+    by_id = {t["id"]: t for t in todo["tasks"] if isinstance(t, dict) and t.get("id")}
     created = 0
     for idx, batch in enumerate(batches, start=1):
-        ts = datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
+        now = datetime.utcnow()
+        ts = now.strftime("%Y%m%dT%H%M%SZ")
         batch_file = BATCH_DIR / f"batch_{idx}_{ts}.json"
         write_json_safe(batch_file, {"created_at": ts, "tasks": batch})
-        logger.info(f"Created batch {batch_file} with {len(batch)} tasks.")
+        logger.info("Created batch %s with %d tasks.", batch_file, len(batch))
         created += 1
         # mark tasks as 'batched'
         for t in batch:
-            for z in todo["tasks"]:
-                if z.get("id") == t.get("id"):
-                    z["status"] = "batched"
-                    z["batched_at"] = ts
+            tgt = by_id.get(t.get("id"))
+            if tgt:
+                tgt["status"] = "batched"
+                tgt["batched_at"] = ts
         if delay:
             time.sleep(delay)
 
@@ -401,68 +533,76 @@ def cmd_codegen(args):
     # update state
     st = load_json_safe(STATE_FILE) or {}
     st["last_codegen"] = {"batches": created, "time": datetime.utcnow().isoformat() + "Z"}
-    write_json_safe(STATE_FILE, st, merge=True)
+    write_json_safe(STATE_FILE, st)
     return EXIT_OK
 
 
-def cmd_doctor(args):
-    """Run a full health check and report issues"""
-    ensure_memory_dirs()
-    issues = []
-    # 1) venv check
-    venv_path = ROOT / "venv"
-    if venv_path.exists():
-        logger.info("venv: present")
-    else:
-        issues.append("venv missing (run init to create or create a venv)")
-
-    # 2) adb check
-    adb_path = shutil.which("adb")
-    if adb_path:
-        logger.info(f"adb: found at {adb_path}")
-        # try devices
-        rc, out = run_subprocess(["adb", "devices"], capture=True)
-        if rc == 0:
-            logger.info("adb devices output:")
-            logger.info(out)
-        else:
-            issues.append("adb present but 'adb devices' failed or returned error")
-    else:
-        issues.append("adb not found on PATH")
+# Doctor checks: each returns (info_lines, issues) so they can run concurrently
+# and still be reported in a fixed order.
+
+
+def _check_venv():
+    if (ROOT / "venv").exists():
+        return ["venv: present"], []
+    return [], ["venv missing (run init to create or create a venv)"]
+
+
+def _check_adb():
+    adb_path = _which("adb")
+    if not adb_path:
+        return [], ["adb not found on PATH"]
+    info = [f"adb: found at {adb_path}"]
+    rc, out = run_subprocess(["adb", "devices"], capture=True)
+    if rc != 0:
+        return info, ["adb present but 'adb devices' failed or returned error"]
+    return info + ["adb devices output:", out], []
+
 
-    # 3) Android SDK env
+def _check_sdk():
     if os.getenv("ANDROID_HOME") or os.getenv("ANDROID_SDK_ROOT"):
-        logger.info("Android SDK env var detected")
-    else:
-        issues.append("ANDROID_HOME / ANDROID_SDK_ROOT not set")
+        return ["Android SDK env var detected"], []
+    return [], ["ANDROID_HOME / ANDROID_SDK_ROOT not set"]
 
-    # 4) seed files
-    if is_placeholder_json(FEATURES_FILE):
-        issues.append("PROGRAM_FEATURES.json missing or placeholder")
-    else:
-        logger.info("PROGRAM_FEATURES.json: OK")
+
+def _check_features():
+    placeholder = is_placeholder_json(FEATURES_FILE)
+    if placeholder:
+        return [], ["PROGRAM_FEATURES.json missing or placeholder"]
+    return ["PROGRAM_FEATURES.json: OK"], []
+
+
+def _check_research():
     if is_placeholder_md(RESEARCH_FILE):
-        issues.append("RESEARCH_GUIDELINES.md missing or placeholder")
-    else:
-        logger.info("RESEARCH_GUIDELINES.md: OK")
+        return [], ["RESEARCH_GUIDELINES.md missing or placeholder"]
+    return ["RESEARCH_GUIDELINES.md: OK"], []
 
-    # 5) vector DB count
-    vs = TOOLS_DIR / "vector_store.py"
-    if vs.exists():
-        rc, out = run_subprocess([sys.executable, str(vs), "--count"], capture=True)
-        if rc == 0:
-            try:
-                # vector_store prints like: vectors: N
-                for line in out.splitlines():
-                    if "vectors" in line.lower():
-                        logger.info(line.strip())
-                        break
-            except Exception:
-                logger.info("vector_store count: output:\n" + out)
-        else:
-            issues.append("vector_store CLI returned error on --count")
-    else:
-        logger.info("vector_store not present in tools/ (skipping vector check)")
+
+def _check_vector_count():
+    if not (TOOLS_DIR / "vector_store.py").exists():
+        return ["vector_store not present in tools/ (skipping vector check)"], []
+    rc, out = _run_tool("vector_store", ["--count"])
+    if rc != 0:
+        return [], ["vector_store CLI returned error on --count"]
+    # vector_store prints like: vectors: N
+    for line in out.splitlines():
+        if "vectors" in line.lower():
+            return [line.strip()], []
+    return ["vector_store count: output:\n" + out], []
+
+
+def cmd_doctor(args):
+    """Run a full health check and report issues"""
+    ensure_memory_dirs()
+    checks = [_check_venv, _check_adb, _check_sdk, _check_features, _check_research, _check_vector_count]
+    # checks are independent and mostly wait on subprocesses, so overlap them
+    with ThreadPoolExecutor(max_workers=len(checks)) as ex:
+        results = list(ex.map(lambda check: check(), checks))
+
+    issues = []
+    for info, found in results:
+        for line in info:
+            logger.info(line)
+        issues.extend(found)
 
     # print issues summary
     if issues:
@@ -479,14 +619,10 @@ def cmd_status(args):
     cnt = 0
     vs = TOOLS_DIR / "vector_store.py"
     if vs.exists():
-        rc, out = run_subprocess([sys.executable, str(vs), "--count"], capture=True)
+        rc, out = _run_tool("vector_store", ["--count"])
         if rc == 0:
-            for line in out.splitlines():
-                if "vectors" in line.lower():
-                    try:
-                        cnt = int(''.join([c for c in line if c.isdigit()]))
-                    except Exception:
-                        cnt = 0
+            m = _COUNT_RE.search(out)
+            cnt = int(m.group(1)) if m else 0
     logger.info(f"Vector DB: {cnt} entries")
     for f in [FEATURES_FILE, RESEARCH_FILE, CONFIG_FILE]:
         logger.info(f"{f.name}: {'OK' if f.exists() else 'MISSING'}")
@@ -504,7 +640,7 @@ def cmd_clean(args):
     if not clean_script.exists():
         logger.error("clean_repo.py missing in tools/")
         return EXIT_FAIL
-    rc, out = run_subprocess([sys.executable, str(clean_script)], capture=True)
+    rc, out = _run_tool("clean_repo")
     if rc != 0:
         logger.error("clean_repo failed:\n" + out)
         return EXIT_FAIL
@@ -533,6 +669,7 @@ def build_parser():
 
     # flags
     p.add_argument("--edit-missing", action="store_true", help="During init, open missing seed files in editor automatically")
+    p.add_argument("--subprocess", action="store_true", help="Run tools/*.py in separate interpreters instead of in-process")
     return p
 
 
@@ -540,6 +677,12 @@ def main():
     parser = build_parser()
     args = parser.parse_args()
 
+    global RUN_TOOLS_IN_SUBPROCESS
+    RUN_TOOLS_IN_SUBPROCESS = args.subprocess
+
+    # installed here, not at import, so importers keep their own SIGTERM handling
+    signal.signal(signal.SIGTERM, _flush_logs_on_sigterm)
+
     # ensure memory dirs exist
     ensure_memory_dirs()
 
@@ -1,9 +1,11 @@
 #!/usr/bin/env python3
+import json
 import os
 from pathlib import Path
 
 ROOT = Path(__file__).resolve().parent
 TOOLS_DIR = ROOT / "tools"
+CACHE_FILE = ROOT / ".patch_tools.cache.json"
 
 # Shim we want to inject
 SHIM = """\
@@ -15,14 +17,34 @@ if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 """
 
+# Presence of this marker means the shim is already in place
+_SHIM_SENTINEL = b"Path(__file__).resolve().parents[1]"
+# The shim is injected at the top, so the sentinel always lands in this prefix
+HEAD_BYTES = 4096
+
+def load_cache():
+    """Load {path: [st_mtime_ns, st_size]} of files already known to be patched."""
+    if not CACHE_FILE.exists():
+        return {}
+    try:
+        return json.loads(CACHE_FILE.read_bytes())
+    except Exception:
+        return {}
+
+def save_cache(cache):
+    CACHE_FILE.write_text(json.dumps(cache, indent=2, sort_keys=True))
+
 def patch_file(file_path: Path):
-    text = file_path.read_text()
+    with file_path.open("rb") as f:
+        head = f.read(HEAD_BYTES)
 
     # Skip if shim already present
-    if "Path(__file__).resolve().parents[1]" in text:
+    if _SHIM_SENTINEL in head:
         print(f"✔ Already patched: {file_path.name}")
         return
 
+    text = file_path.read_text()
+
     # Find first non-shebang line
     lines = text.splitlines()
     insert_at = 0
@@ -34,15 +56,26 @@ def patch_file(file_path: Path):
     file_path.write_text("\n".join(lines) + "\n")
     print(f"🔧 Patched: {file_path.name}")
 
+def _stat_key(path: Path):
+    st = path.stat()
+    return [st.st_mtime_ns, st.st_size]
+
 def main():
     if not TOOLS_DIR.exists():
         print("❌ No tools/ directory found.")
         return
 
+    cache = load_cache()
     for py_file in TOOLS_DIR.glob("*.py"):
         if py_file.name == "__init__.py":
             continue
+        key = str(py_file)
+        # untouched since it was last confirmed patched: no read at all
+        if cache.get(key) == _stat_key(py_file):
+            continue
         patch_file(py_file)
+        cache[key] = _stat_key(py_file)
+    save_cache(cache)
 
     print("\n🎉 All tool scripts patched successfully.")
 
@@ -0,0 +1,60 @@
+import sys
+import zipfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import pytest
+
+from tools import package_release
+
+
+def _make_tree(base):
+    files = {
+        "big_a.txt": b"".join(b"line %d of a\n" % i for i in range(40000)),
+        "nested/big_b.txt": b"".join(b"row %d of b, some filler text\n" % i for i in range(20000)),
+        "small.txt": b"tiny",
+        "img.png": bytes(range(256)) * 8,
+        "__pycache__/skip.pyc": b"x",
+    }
+    for rel, data in files.items():
+        path = base / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+    return files
+
+
+@pytest.mark.parametrize("parallel", [True, False])
+def test_build_archive_round_trip(tmp_path, monkeypatch, parallel):
+    base = tmp_path / "repo"
+    files = _make_tree(base)
+    assert len(files["big_a.txt"]) >= package_release.PARALLEL_MIN_SIZE
+    assert len(files["nested/big_b.txt"]) >= package_release.PARALLEL_MIN_SIZE
+    if not parallel:
+        monkeypatch.setattr(package_release, "_can_write_deflated", lambda: False)
+    deflated = []
+    write_deflated = package_release._write_deflated
+
+    def spy(zf, zinfo, *args):
+        deflated.append(zinfo.filename)
+        write_deflated(zf, zinfo, *args)
+
+    monkeypatch.setattr(package_release, "_write_deflated", spy)
+
+    zip_path = tmp_path / "out.zip"
+    package_release.build_archive(str(base), str(zip_path))
+    if parallel and package_release._can_write_deflated():
+        assert sorted(deflated) == ["big_a.txt", "nested/big_b.txt"]
+    else:
+        assert deflated == []
+
+    with zipfile.ZipFile(zip_path) as zf:
+        assert zf.testzip() is None
+        names = set(zf.namelist())
+        assert names == {"big_a.txt", "nested/big_b.txt", "small.txt", "img.png"}
+        for name in names:
+            assert zf.read(name) == files[name]
+        assert zf.getinfo("big_a.txt").compress_type == zipfile.ZIP_DEFLATED
+        assert zf.getinfo("img.png").compress_type == zipfile.ZIP_STORED
@@ -0,0 +1,34 @@
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from tools.sync_memory import merge_todos
+
+
+def test_merge_todos_keeps_idless_tasks():
+    merged, added = merge_todos({"tasks": []}, [{"title": "a"}, {"title": "b"}])
+    assert merged["tasks"] == [{"title": "a"}, {"title": "b"}]
+    assert added == 2
+
+
+def test_merge_todos_skips_known_and_duplicate_ids_in_order():
+    existing = {"tasks": [{"id": "x", "title": "old x"}, {"title": "loose"}]}
+    new_tasks = [
+        {"id": "y", "title": "y"},
+        {"id": "x", "title": "new x"},
+        {"title": "idless"},
+        {"id": "y", "title": "y again"},
+        {"id": "z", "title": "z"},
+    ]
+    merged, added = merge_todos(existing, new_tasks)
+    assert [t["title"] for t in merged["tasks"]] == ["old x", "loose", "y", "idless", "z"]
+    assert added == 3
+
+
+def test_merge_todos_creates_task_list():
+    merged, added = merge_todos({}, [{"id": "a"}])
+    assert merged == {"tasks": [{"id": "a"}]}
+    assert added == 1
@@ -0,0 +1,147 @@
+import json
+import math
+import sqlite3
+import sys
+from array import array
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import pytest
+
+from tools import vector_store
+
+
+class _FakeModel:
+    """Stands in for sentence-transformers: deterministic 384-d unit vectors."""
+
+    def encode(self, texts, batch_size=32, convert_to_numpy=True, normalize_embeddings=True):
+        np = pytest.importorskip("numpy")
+        out = []
+        for t in texts:
+            rng = np.random.default_rng(sum(t.encode("utf-8")))
+            v = rng.standard_normal(384).astype(np.float32)
+            out.append(v / np.linalg.norm(v))
+        return np.stack(out)
+
+
+@pytest.fixture
+def vs(tmp_path, monkeypatch):
+    vector_store._close_connections()
+    monkeypatch.setattr(vector_store, "DB_PATH", tmp_path / "vectors.sqlite")
+    monkeypatch.setattr(vector_store, "ANN_INDEX_PATH", tmp_path / "index.faiss")
+    # hash fallback by default; never load the real model in tests
+    monkeypatch.setattr(vector_store, "_get_model", lambda: None)
+    yield vector_store
+    vector_store._close_connections()
+
+
+@pytest.fixture
+def ann(vs):
+    pytest.importorskip("faiss")
+    if vs.faiss is None:
+        pytest.skip("faiss not importable from tools.vector_store")
+    return vs
+
+
+def _contents(results):
+    return [r["content"] for r in results]
+
+
+def test_init_db_migrates_v0_json_db(vs, monkeypatch):
+    # layout written before schema versioning: JSON-encoded, unnormalized vectors
+    conn = sqlite3.connect(str(vs.DB_PATH))
+    conn.execute(
+        """CREATE TABLE vectors (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            source_id TEXT NOT NULL,
+            content TEXT NOT NULL,
+            metadata TEXT,
+            embedding BLOB NOT NULL
+        )"""
+    )
+    old_fallback = [(i % 7) / 7 for i in range(vs._FALLBACK_DIM)]
+    model_vec = [2.0] * 384
+    conn.executemany(
+        "INSERT INTO vectors (source_id, content, metadata, embedding) VALUES (?, ?, ?, ?)",
+        [
+            ("F", "hello world", "{}", json.dumps(old_fallback).encode("utf-8")),
+            ("M", "model text", "{}", json.dumps(model_vec).encode("utf-8")),
+        ],
+    )
+    conn.commit()
+    conn.close()
+
+    def no_model():
+        raise AssertionError("init_db must not load the embedding model")
+
+    monkeypatch.setattr(vs, "_get_model", no_model)
+    vs.init_db()
+
+    conn = sqlite3.connect(str(vs.DB_PATH))
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == 3
+    rows = dict(conn.execute("SELECT source_id, embedding FROM vectors"))
+    conn.close()
+    # raw float32 bytes, one row per original dimension
+    assert len(rows["F"]) == 4 * vs._FALLBACK_DIM
+    assert len(rows["M"]) == 4 * 384
+    fallback = array("f", rows["F"])
+    model = array("f", rows["M"])
+    for vec in (fallback, model):
+        assert math.isclose(math.sqrt(sum(x * x for x in vec)), 1.0, rel_tol=1e-5)
+    # fallback rows are re-hashed from content; model rows are only normalized
+    expected = vs._fallback_embed(["hello world"])[0]
+    assert all(math.isclose(a, b, abs_tol=1e-6) for a, b in zip(fallback, expected))
+    assert all(math.isclose(x, 1 / math.sqrt(384), rel_tol=1e-5) for x in model)
+
+    monkeypatch.setattr(vs, "_get_model", lambda: None)
+    assert vs.query("hello world", top_k=1, use_ann=False)[0]["source_id"] == "F"
+
+
+def test_query_fetches_details_in_chunks(vs, monkeypatch):
+    monkeypatch.setattr(vs, "_SQL_MAX_VARS", 2)
+    vs.ingest("A", "\n\n".join(f"para {i}" for i in range(6)))
+    res = vs.query("para 3", top_k=5, use_ann=False)
+    assert len(res) == 5
+    assert res[0]["content"] == "para 3"
+
+
+def test_ann_mixed_dimensions(ann, monkeypatch):
+    monkeypatch.setattr(ann, "_get_model", lambda: _FakeModel())
+    ann.ingest("M", "model one\n\nmodel two")
+    assert _contents(ann.query("model one", top_k=1, use_ann=True)) == ["model one"]
+    assert ann._ANN_INDEX.d == 384
+
+    # model gone: 32-d rows join the 384-d ones and the 384-d index stays on disk
+    monkeypatch.setattr(ann, "_get_model", lambda: None)
+    ann.ingest("F", "fallback one\n\nfallback two\n\nfallback three")
+    res = ann.query("fallback two", top_k=5, use_ann=True)
+    assert _contents(res)[0] == "fallback two"
+    assert {r["source_id"] for r in res} == {"F"}
+
+    # once no 384-d rows remain, the index is rebuilt at the query's dimension
+    ann.delete_source("M")
+    assert _contents(ann.query("fallback one", top_k=1, use_ann=True)) == ["fallback one"]
+    assert ann._ANN_INDEX.d == 32
+    assert ann._ANN_INDEX.ntotal == 3
+
+
+def test_ann_stale_index_is_rebuilt(ann):
+    ann.ingest("A", "alpha\n\nbeta\n\ngamma")
+    assert _contents(ann.query("beta", top_k=1, use_ann=True)) == ["beta"]
+    first = ann._ANN_INDEX
+
+    # new rows only: appended to the same index
+    ann.ingest("B", "delta")
+    assert _contents(ann.query("delta", top_k=1, use_ann=True)) == ["delta"]
+    assert ann._ANN_INDEX is first
+    assert first.ntotal == 4
+
+    # re-ingesting A deletes indexed rows -> rebuilt, no stale entries served
+    ann.ingest("A", "epsilon\n\nzeta")
+    res = ann.query("epsilon", top_k=10, use_ann=True)
+    assert ann._ANN_INDEX is not first
+    assert ann._ANN_INDEX.ntotal == 3
+    assert sorted(_contents(res)) == ["delta", "epsilon", "zeta"]
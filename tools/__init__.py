@@ -1,4 +1,16 @@
 # tools/__init__.py
 # Makes tools a Python package for clean imports
 
-from . import safe_writer, logger, adb_helper, vector_store
+import importlib
+
+from . import safe_writer, logger, adb_helper
+
+# Heavy submodules are imported on first attribute access, so `import tools`
+# (pulled in by every `from tools.x import ...`) stays cheap.
+_LAZY_SUBMODULES = {"vector_store"}
+
+
+def __getattr__(name):
+    if name in _LAZY_SUBMODULES:
+        return importlib.import_module(f"{__name__}.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,20 @@
+# tools/_json_cache.py
+# Parsed-JSON cache shared by the tools that read the same seed files
+# (PROGRAM_FEATURES.json, config.json). Entries are keyed by path + mtime, so
+# an edited file is re-parsed automatically.
+
+import functools
+import json
+from pathlib import Path
+
+
+@functools.lru_cache(maxsize=32)
+def _load(path: str, mtime_ns: int):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_json_cached(path):
+    """Return the parsed JSON at path. The result is shared; treat it as read-only."""
+    path = Path(path)
+    return _load(str(path), path.stat().st_mtime_ns)
@@ -46,7 +46,7 @@ def ensure_gitignore():
     gi.write_text("\n".join(sorted(updated)) + "\n")
     print("✅ Updated .gitignore")
 
-if __name__ == "__main__":
+def main():
     # Remove duplicate virtualenv
     remove_dir(".venv")
 
@@ -60,3 +60,6 @@ if __name__ == "__main__":
     ensure_gitignore()
 
     print("🎉 Cleanup complete")
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,101 @@
 #!/usr/bin/env python3
 import os
+import sys
 import zipfile
+import zlib
 import json
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from itertools import repeat
 
 EXCLUDE_DIRS = {".git", "venv", ".venv", ".pytest_cache", "__pycache__", "dist"}
 EXCLUDE_FILES = {"file_manifest.json", ".DS_Store"}
+# already-compressed formats: deflating them again costs CPU and rarely saves bytes
+STORED_EXTS = {".png", ".jpg", ".jpeg", ".webp", ".gif", ".mp4", ".zip", ".gz", ".xz", ".bz2", ".7z", ".jar", ".apk", ".aar"}
+COMPRESS_LEVEL = 6
+# files at least this big are deflated in worker processes; smaller ones aren't worth the pickling
+PARALLEL_MIN_SIZE = 256 * 1024
 
 def should_include(path):
-    parts = path.split(os.sep)
-    if any(part in EXCLUDE_DIRS for part in parts):
-        return False
+    # excluded dirs are skipped during the walk, so only file names need checking
     if os.path.basename(path) in EXCLUDE_FILES:
         return False
     return True
 
+def compress_type_for(name):
+    if os.path.splitext(name)[1].lower() in STORED_EXTS:
+        return zipfile.ZIP_STORED
+    return zipfile.ZIP_DEFLATED
+
+def _deflate(path, level):
+    # raw deflate stream (no zlib header), as stored in a zip entry
+    with open(path, "rb") as f:
+        raw = f.read()
+    co = zlib.compressobj(level, zlib.DEFLATED, -15)
+    return zlib.crc32(raw), len(raw), co.compress(raw) + co.flush()
+
+# _write_deflated mirrors ZipFile._open_to_write using private ZipFile state, so it
+# only runs on CPython versions whose zipfile it has been checked against
+# (tests/test_package_release.py, CI matrix); anything else uses zf.write
+_DEFLATED_WRITE_PYTHONS = ((3, 9), (3, 13))
+
+def _can_write_deflated():
+    lo, hi = _DEFLATED_WRITE_PYTHONS
+    return sys.implementation.name == "cpython" and lo <= sys.version_info[:2] <= hi
+
+def _write_deflated(zf, zinfo, crc, size, data):
+    # append an entry whose data was already deflated elsewhere; mirrors ZipFile.open(..., "w")
+    zinfo.compress_type = zipfile.ZIP_DEFLATED
+    zinfo.CRC = crc
+    zinfo.file_size = size
+    zinfo.compress_size = len(data)
+    zip64 = size > zipfile.ZIP64_LIMIT or len(data) > zipfile.ZIP64_LIMIT
+    with zf._lock:
+        if zf._writing:
+            raise ValueError("Can't write to the ZIP file while there is another write handle open on it.")
+        zf.fp.seek(zf.start_dir)
+        zinfo.header_offset = zf.fp.tell()
+        zf._writecheck(zinfo)
+        zf._didModify = True
+        zf.fp.write(zinfo.FileHeader(zip64))
+        zf.fp.write(data)
+        zf.start_dir = zf.fp.tell()
+        zf.filelist.append(zinfo)
+        zf.NameToInfo[zinfo.filename] = zinfo
+
+def build_archive(base_dir, zip_path):
+    """Zip every included file under base_dir into zip_path."""
+    entries = []
+    # DirEntry carries the file type from the directory read, so no extra stat per entry
+    stack = [base_dir]
+    while stack:
+        with os.scandir(stack.pop()) as it:
+            for e in it:
+                if e.is_dir(follow_symlinks=False):
+                    # excluded dirs are never descended into
+                    if e.name not in EXCLUDE_DIRS:
+                        stack.append(e.path)
+                elif e.is_file() and should_include(e.name):
+                    parallel = (compress_type_for(e.name) == zipfile.ZIP_DEFLATED
+                                and e.stat().st_size >= PARALLEL_MIN_SIZE)
+                    entries.append((e.path, os.path.relpath(e.path, base_dir), parallel))
+
+    big = [full_path for full_path, _, parallel in entries if parallel]
+    with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED, compresslevel=COMPRESS_LEVEL) as zf:
+        if len(big) < 2 or not _can_write_deflated():
+            for full_path, rel_path, _ in entries:
+                zf.write(full_path, rel_path, compress_type=compress_type_for(full_path))
+        else:
+            with ProcessPoolExecutor() as pool:
+                # map() yields in submission order, so the archive keeps walk order
+                deflated = pool.map(_deflate, big, repeat(COMPRESS_LEVEL))
+                for full_path, rel_path, parallel in entries:
+                    if parallel:
+                        zinfo = zipfile.ZipInfo.from_file(full_path, rel_path)
+                        _write_deflated(zf, zinfo, *next(deflated))
+                    else:
+                        zf.write(full_path, rel_path, compress_type=compress_type_for(full_path))
+
 def main():
     base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
     dist_dir = os.path.join(base_dir, "dist")
@@ -35,13 +116,7 @@ def main():
     zip_name = f"anyProjectTemplate-v{version}-{ts}.zip"
     zip_path = os.path.join(dist_dir, zip_name)
 
-    with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zf:
-        for root, dirs, files in os.walk(base_dir):
-            for file in files:
-                full_path = os.path.join(root, file)
-                rel_path = os.path.relpath(full_path, base_dir)
-                if should_include(rel_path):
-                    zf.write(full_path, rel_path)
+    build_archive(base_dir, zip_path)
 
     print(f"🎉 Release package created: {zip_path}")
 
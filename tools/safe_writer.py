@@ -25,21 +25,26 @@ def write_file_safe(path: str, content: str, mode="merge"):
     new_checksum = checksum(content)
 
     if file.exists():
-        old = file.read_text()
+        old = file.read_text(encoding="utf-8")
         if HEADER in old:
             if mode == "overwrite":
-                file.write_text(f"{HEADER} [checksum: {new_checksum}]\n{content}")
-                print(f"Overwritten {path}")
+                new_text = f"{HEADER} [checksum: {new_checksum}]\n{content}"
+                # skip rewriting a generated file that already has this exact content
+                if old == new_text:
+                    print(f"No changes for {path}")
+                else:
+                    file.write_text(new_text, encoding="utf-8")
+                    print(f"Overwritten {path}")
             elif mode == "merge":
                 try:
                     old_json = json.loads(old)
                     new_json = json.loads(content)
                     merged = {**old_json, **new_json}
-                    file.write_text(json.dumps(merged, indent=2))
+                    file.write_text(json.dumps(merged, indent=2), encoding="utf-8")
                     print(f"Merged JSON into {path}")
                 except Exception:
                     if content not in old:
-                        file.write_text(old + "\n" + content)
+                        file.write_text(old + "\n" + content, encoding="utf-8")
                         print(f"Appended to {path}")
                     else:
                         print(f"No changes for {path}")
@@ -48,5 +53,5 @@ def write_file_safe(path: str, content: str, mode="merge"):
         else:
             print(f"Manual file detected, leaving {path} untouched.")
     else:
-        file.write_text(f"{HEADER} [checksum: {new_checksum}]\n{content}")
+        file.write_text(f"{HEADER} [checksum: {new_checksum}]\n{content}", encoding="utf-8")
         print(f"Created {path}")
@@ -14,6 +14,7 @@ from pathlib import Path
 import json
 import re
 from tools import safe_writer, logger
+from tools._json_cache import load_json_cached
 
 log = logger.get_logger()
 ROOT = Path(__file__).resolve().parent.parent
@@ -149,13 +150,15 @@ PROGUARD = """# Add your proguard rules here if needed.
 
 GITKEEP = ""  # empty content for .gitkeep
 
+_PKG_RE = re.compile(r'^[a-zA-Z][a-zA-Z0-9_]*(\.[a-zA-Z][a-zA-Z0-9_]*)+$')
+
 # ----- helpers -----
 def safe_write(path: Path, content: str, mode="merge"):
     safe_writer.write_file_safe(str(path), content, mode=mode)
 
 def _sanitize_package(pkg: str) -> str:
     # simple validation: only letters, digits, underscore, dots
-    if not pkg or not re.match(r'^[a-zA-Z][a-zA-Z0-9_]*(\.[a-zA-Z][a-zA-Z0-9_]*)+$', pkg):
+    if not pkg or not _PKG_RE.match(pkg):
         raise ValueError(f"Invalid package name: {pkg}")
     return pkg
 
@@ -167,7 +170,7 @@ def _load_package_from_features():
     if not pf.exists():
         return None
     try:
-        data = json.loads(pf.read_text(encoding="utf-8"))
+        data = load_json_cached(pf)
     except Exception:
         return None
     # try nested keys: android.package or androidPackage or package
@@ -181,7 +184,7 @@ def _load_package_from_config():
     if not cfg.exists():
         return None
     try:
-        data = json.loads(cfg.read_text(encoding="utf-8"))
+        data = load_json_cached(cfg)
     except Exception:
         return None
     return data.get("android_package") or data.get("androidPackage") or data.get("package"), data.get("project", "MyApp")
@@ -263,7 +266,7 @@ def scaffold():
     scaffold_task = {"id": "scaffold:android", "title": "Scaffold Android project", "status": "done", "source": "scaffolder"}
     if scaffold_task["id"] not in ids:
         todo["tasks"].append(scaffold_task)
-        safe_writer.write_file_safe(str(todo_path), json.dumps(todo, indent=2), mode="merge")
+        safe_writer.write_file_safe(str(todo_path), json.dumps(todo, indent=2, ensure_ascii=False), mode="merge")
         log.info("Added scaffold completion to memory/todo.json")
 
     log.success(f"Android scaffold created at {ANDROID_ROOT}")
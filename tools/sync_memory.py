@@ -11,6 +11,7 @@ import json
 import os
 from pathlib import Path
 from tools import safe_writer, logger, vector_store
+from tools._json_cache import load_json_cached
 
 log = logger.get_logger()
 
@@ -23,9 +24,7 @@ TODO_FILE = MEMORY_DIR / "todo.json"
 def load_program_features():
     if not PROGRAM_FEATURES.exists():
         raise FileNotFoundError("PROGRAM_FEATURES.json not found. Please populate it.")
-    with open(PROGRAM_FEATURES, "r", encoding="utf-8") as f:
-        data = json.load(f)
-    return data
+    return load_json_cached(PROGRAM_FEATURES)
 
 def load_research_guidelines():
     if not RESEARCH_GUIDELINES.exists():
@@ -50,7 +49,8 @@ def generate_tasks_from_features(features: dict):
         }
         # sub-tasks if modules listed
         subs = []
-        for mod in feat.get("modules", []) if isinstance(feat.get("modules", []), list) else []:
+        mods = feat.get("modules", [])
+        for mod in mods if isinstance(mods, list) else []:
             subs.append({
                 "id": f"{task['id']}-{mod.get('name','mod')}",
                 "title": mod.get("name"),
@@ -69,17 +69,19 @@ def merge_todos(existing: dict, new_tasks: list):
     """
     if "tasks" not in existing:
         existing["tasks"] = []
-    known = {t["id"] for t in existing["tasks"] if "id" in t}
+    by_id = {t["id"]: t for t in existing["tasks"] if "id" in t}
     appended = 0
     for t in new_tasks:
-        if t.get("id") in known:
-            continue
-        existing["tasks"].append(t)
-        appended += 1
+        # id-less tasks are always appended; otherwise setdefault returns t only if
+        # its id was unseen (also dedups within new_tasks)
+        if "id" not in t or by_id.setdefault(t["id"], t) is t:
+            existing["tasks"].append(t)
+            appended += 1
     return existing, appended
 
 def write_todo_json(obj):
-    safe_writer.write_file_safe(str(TODO_FILE), json.dumps(obj, indent=2), mode="merge")
+    # ensure_ascii=False writes non-ASCII titles as-is instead of escaping each code point
+    safe_writer.write_file_safe(str(TODO_FILE), json.dumps(obj, indent=2, ensure_ascii=False), mode="merge")
 
 def sync():
     log.info("Starting sync: reading seeds, updating memory.json and vector DB")
@@ -103,17 +105,22 @@ def sync():
     # 1) generate tasks
     new_tasks = generate_tasks_from_features(features)
     merged, added = merge_todos(current, new_tasks)
-    write_todo_json(merged)
+    # nothing new -> leave todo.json untouched (still create it on first run)
+    if added or not TODO_FILE.exists():
+        write_todo_json(merged)
     log.info(f"Tasks merged into {TODO_FILE} — added {added} new tasks")
 
     # 2) ingest vector DB: PROGRAM_FEATURES.json and RESEARCH_GUIDELINES.md
+    # both sources go through one ingest_many call -> a single embedding pass
     pf_text = json.dumps(features, indent=2)
-    n_pf = vector_store.ingest("PROGRAM_FEATURES", pf_text, metadata={"type":"features"})
-    log.info(f"Ingested PROGRAM_FEATURES into vector DB: {n_pf} chunks")
-
+    items = [("PROGRAM_FEATURES", pf_text, {"type":"features"})]
     if research_md.strip():
-        n_r = vector_store.ingest("RESEARCH_GUIDELINES", research_md, metadata={"type":"research"})
-        log.info(f"Ingested RESEARCH_GUIDELINES into vector DB: {n_r} chunks")
+        items.append(("RESEARCH_GUIDELINES", research_md, {"type":"research"}))
+    counts = vector_store.ingest_many(items)
+    log.info(f"Ingested PROGRAM_FEATURES into vector DB: {counts[0]} chunks")
+
+    if len(counts) > 1:
+        log.info(f"Ingested RESEARCH_GUIDELINES into vector DB: {counts[1]} chunks")
     else:
         log.info("No RESEARCH_GUIDELINES.md content to ingest")
 
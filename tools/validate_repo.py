@@ -49,8 +49,10 @@ def ensure_dir(path):
     else:
         print(f"✔ Directory exists: {path}")
 
-    # ensure .gitkeep if empty
-    if not any(os.scandir(path)):
+    # ensure .gitkeep if empty; the with block closes the directory handle
+    with os.scandir(path) as it:
+        empty = next(it, None) is None
+    if empty:
         gitkeep = os.path.join(path, ".gitkeep")
         open(gitkeep, "a").close()
         print(f"➕ Added .gitkeep to {path}")
@@ -63,13 +65,11 @@ def check_gitignore():
     with open(".gitignore", "r") as f:
         lines = f.read().splitlines()
 
-    updated = False
-    for item in IGNORED_ITEMS:
-        if item not in lines:
-            lines.append(item)
-            updated = True
+    existing = set(lines)
+    missing = [item for item in IGNORED_ITEMS if item not in existing]
 
-    if updated:
+    if missing:
+        lines.extend(missing)
         with open(".gitignore", "w") as f:
             f.write("\n".join(lines) + "\n")
         print("✅ Updated .gitignore")
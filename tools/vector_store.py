@@ -6,40 +6,104 @@ and a deterministic fallback embedding when the library is not available.
 API:
   init_db()
   ingest(source_id, text, metadata=dict())
+  ingest_many([(source_id, text, metadata), ...]) -> list of chunk counts
   delete_source(source_id)
-  query(query_text, top_k=5) -> list of dicts {score, source_id, text, metadata}
+  query(query_text, top_k=5, use_ann=None) -> list of dicts {score, source_id, text, metadata}
   count()
 """
 
+import atexit
 import os
 import sqlite3
 import json
+import threading
+from array import array
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import math
 
-# Attempt to import a proper embedding model
 try:
-    from sentence_transformers import SentenceTransformer, util
-    _HAS_MODEL = True
-    _MODEL = SentenceTransformer("all-MiniLM-L6-v2")
-except Exception:
-    _HAS_MODEL = False
-    _MODEL = None
+    import numpy as np
+except ImportError:
+    np = None
+
+# optional approximate-NN index for large DBs (faiss-cpu)
+try:
+    import faiss
+except ImportError:
+    faiss = None
+
+# The embedding model is loaded on first use (see _get_model), so count(),
+# delete_source() and --clear never pay for importing torch.
+# _HAS_MODEL is None until the load has been attempted.
+_MODEL = None
+_HAS_MODEL = None
+_MODEL_LOCK = threading.Lock()
 
 ROOT = Path(__file__).resolve().parent.parent
 VECTOR_DIR = ROOT / "vector_db"
 VECTOR_DIR.mkdir(parents=True, exist_ok=True)
 DB_PATH = VECTOR_DIR / "vectors.sqlite"
 
-_EMBED_DIM = 384 if _HAS_MODEL else 32  # fallback dim
+_FALLBACK_DIM = 32
+# chunks per model.encode call (also its batch_size); ingest overlaps the next encode with row inserts
+_ENCODE_BATCH = 64
+
+# query(use_ann=None) switches to the faiss HNSW index at this many vectors;
+# below it a brute-force scan is just as fast and exact
+ANN_MIN_VECTORS = 10_000
+ANN_INDEX_PATH = VECTOR_DIR / "index.faiss"
+_ANN_HNSW_M = 32
+# ids per "WHERE id IN (...)"; stays under SQLite's bound-variable limit (999 before 3.32)
+_SQL_MAX_VARS = 900
+_ANN_INDEX = None
+_ANN_LOCK = threading.Lock()
+
+# bump when the on-disk row format changes; init_db() migrates older DBs
+# 1: embeddings stored as raw float32 bytes instead of JSON text
+# 2: embeddings stored L2-normalized, so query scores are plain dot products
+# 3: fallback embedder changed; rows are re-embedded from their stored content
+_SCHEMA_VERSION = 3
 
 # --- DB helpers ---
+_INITIALIZED = False
+# one long-lived connection per thread, keyed by thread id; closed at exit
+_CONNECTIONS = {}
+_CONN_LOCK = threading.Lock()
+
 def _connect():
-    conn = sqlite3.connect(str(DB_PATH))
+    tid = threading.get_ident()
+    conn = _CONNECTIONS.get(tid)
+    if conn is not None:
+        return conn
+    conn = sqlite3.connect(str(DB_PATH), check_same_thread=False)
+    # WAL (set persistently in init_db) makes NORMAL sync safe and much cheaper than FULL
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    with _CONN_LOCK:
+        _CONNECTIONS[tid] = conn
     return conn
 
+def _close_connections():
+    """Close every cached connection; the next call reconnects and re-runs init_db."""
+    global _INITIALIZED, _ANN_INDEX
+    with _CONN_LOCK:
+        for conn in _CONNECTIONS.values():
+            conn.close()
+        _CONNECTIONS.clear()
+    _INITIALIZED = False
+    _ANN_INDEX = None
+
+atexit.register(_close_connections)
+
 def init_db():
+    """Create/migrate the schema; only does work on the first call per process."""
+    global _INITIALIZED
+    if _INITIALIZED:
+        return
     conn = _connect()
+    conn.execute("PRAGMA journal_mode=WAL")
     conn.execute(
         """CREATE TABLE IF NOT EXISTS vectors (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -49,49 +113,91 @@ def init_db():
             embedding BLOB NOT NULL
         )"""
     )
+    # ingest and delete_source filter by source_id
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_vectors_source ON vectors(source_id)")
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version < 1:
+        # rows written before v1 hold JSON-encoded vectors; re-encode as float32 bytes
+        rows = conn.execute("SELECT id, embedding FROM vectors").fetchall()
+        conn.executemany(
+            "UPDATE vectors SET embedding = ? WHERE id = ?",
+            [(_vector_to_blob(json.loads(blob.decode("utf-8"))), _id) for _id, blob in rows],
+        )
+    if version < 2:
+        rows = conn.execute("SELECT id, embedding FROM vectors").fetchall()
+        conn.executemany(
+            "UPDATE vectors SET embedding = ? WHERE id = ?",
+            [(_vector_to_blob(_normalize(_blob_to_vector(blob))), _id) for _id, blob in rows],
+        )
+    if version < 3:
+        # only hash-fallback rows changed; model rows are left alone and no model is loaded
+        rows = conn.execute(
+            "SELECT id, content FROM vectors WHERE length(embedding) = ?", (_FALLBACK_DIM * 4,)
+        ).fetchall()
+        if rows:
+            vectors = _fallback_embed([content for _, content in rows])
+            conn.executemany(
+                "UPDATE vectors SET embedding = ? WHERE id = ?",
+                [(_vector_to_blob(vec), _id) for (_id, _), vec in zip(rows, vectors)],
+            )
+    if version < _SCHEMA_VERSION:
+        conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
     conn.commit()
-    conn.close()
+    _INITIALIZED = True
 
 # --- Embedding helpers ---
+def _get_model():
+    """Return the sentence-transformers model, loading it once; None if unavailable."""
+    global _MODEL, _HAS_MODEL
+    if _HAS_MODEL is None:
+        with _MODEL_LOCK:
+            if _HAS_MODEL is None:
+                try:
+                    from sentence_transformers import SentenceTransformer
+                    _MODEL = SentenceTransformer("all-MiniLM-L6-v2")
+                    _HAS_MODEL = True
+                except Exception:
+                    _HAS_MODEL = False
+    return _MODEL
+
 def _embed_texts(texts):
     """
-    Return list of float32 lists.
+    Return list of unit-length float32 lists.
     Try to use sentence-transformers if available. Otherwise produce deterministic fallback vectors.
     """
-    if _HAS_MODEL:
-        embs = _MODEL.encode(texts, convert_to_numpy=True)
+    model = _get_model()
+    if model is not None:
+        embs = model.encode(texts, batch_size=_ENCODE_BATCH, convert_to_numpy=True, normalize_embeddings=True)
         # Ensure they are float32 lists
         return [emb.astype("float32").tolist() for emb in embs]
-    # fallback: deterministic hashing -> vector
+    return _fallback_embed(texts)
+
+def _fallback_embed(texts):
+    """Deterministic hashing -> unit vector, used when no model is available."""
     import hashlib
     import struct
+    unpack = struct.Struct(f">{_FALLBACK_DIM}I").unpack
     out = []
     for t in texts:
-        h = hashlib.sha256(t.encode("utf-8")).digest()
-        # generate _EMBED_DIM floats from hash by repeating and interpreting bytes
-        floats = []
-        # expand bytes to enough bytes
-        rep = h
-        while len(rep) < _EMBED_DIM * 4:
-            rep += hashlib.sha256(rep).digest()
-        for i in range(_EMBED_DIM):
-            start = i * 4
-            chunk = rep[start:start+4]
-            # interpret chunk as unsigned int and normalize
-            val = struct.unpack(">I", chunk)[0]
-            floats.append((val % 10000) / 10000.0)  # [0,1)
-        # normalize to unit length
-        norm = math.sqrt(sum(x*x for x in floats)) or 1.0
-        floats = [x / norm for x in floats]
-        out.append(floats)
+        # a single SHAKE-256 call yields all _FALLBACK_DIM*4 bytes; one unpack turns them into ints
+        raw = hashlib.shake_256(t.encode("utf-8")).digest(_FALLBACK_DIM * 4)
+        # centre on zero so unrelated texts score near 0 instead of all being similar
+        out.append(_normalize([v / 4294967296.0 - 0.5 for v in unpack(raw)]))
     return out
 
+def _normalize(vec):
+    """Scale vec to unit L2 norm (zero vectors are returned unchanged)."""
+    norm = math.sqrt(sum(float(x)*float(x) for x in vec)) or 1.0
+    return [float(x) / norm for x in vec]
+
 def _vector_to_blob(vec):
-    # store as JSON text -> easy and portable
-    return json.dumps(vec).encode("utf-8")
+    # raw float32 bytes: 4 bytes/float and no text parsing on read
+    return array("f", vec).tobytes()
 
 def _blob_to_vector(blob):
-    return json.loads(blob.decode("utf-8"))
+    if np is not None:
+        return np.frombuffer(blob, dtype=np.float32)
+    return array("f", blob)
 
 # --- Public API ---
 def ingest(source_id: str, content: str, metadata: dict = None):
@@ -99,71 +205,228 @@ def ingest(source_id: str, content: str, metadata: dict = None):
     Ingest content associated with a source_id (e.g., 'PROGRAM_FEATURES' or 'RESEARCH_GUIDELINES').
     This function removes any previous vectors for that source_id and inserts new rows.
     """
-    if metadata is None:
-        metadata = {}
+    return ingest_many([(source_id, content, metadata)])[0]
 
+def ingest_many(items):
+    """
+    Ingest several (source_id, content, metadata) items at once.
+    All chunks are written in a single transaction; embedding runs in batches on a
+    worker thread so encoding the next batch overlaps inserting the current one.
+    Returns the number of chunks stored for each item, in order.
+    """
     init_db()
     # chunk content into paragraphs (non-empty)
-    chunks = [p.strip() for p in content.split("\n\n") if p.strip()]
-    if not chunks:
-        return 0
+    chunked = []
+    for source_id, content, metadata in items:
+        chunks = [p.strip() for p in content.split("\n\n") if p.strip()]
+        chunked.append((source_id, chunks, metadata or {}))
+    counts = [len(chunks) for _, chunks, _ in chunked]
+    # a source listed twice keeps only its last chunks, as separate ingest() calls would
+    last = {source_id: i for i, (source_id, chunks, _) in enumerate(chunked) if chunks}
+    rows = []
+    for i, (source_id, chunks, metadata) in enumerate(chunked):
+        if last.get(source_id) == i:
+            # metadata is the same for every chunk of a source
+            meta_json = json.dumps(metadata)
+            rows.extend((source_id, txt, meta_json) for txt in chunks)
+    if not rows:
+        return counts
 
-    vectors = _embed_texts(chunks)
+    batches = _embed_batches([txt for _, txt, _ in rows])
+    # encode the first batch before taking the write lock
+    vectors = next(batches)
     conn = _connect()
-    cur = conn.cursor()
-    # delete previous entries for this source_id
-    cur.execute("DELETE FROM vectors WHERE source_id = ?", (source_id,))
-    # insert new
-    rows = 0
-    for txt, vec in zip(chunks, vectors):
-        cur.execute(
-            "INSERT INTO vectors (source_id, content, metadata, embedding) VALUES (?, ?, ?, ?)",
-            (source_id, txt, json.dumps(metadata), _vector_to_blob(vec)),
-        )
-        rows += 1
-    conn.commit()
-    conn.close()
-    return rows
+    # the connection is reused, so roll back on error rather than leave a transaction open
+    with conn:
+        cur = conn.cursor()
+        cur.execute("BEGIN IMMEDIATE")
+        # delete previous entries for each source being replaced
+        cur.executemany("DELETE FROM vectors WHERE source_id = ?", [(source_id,) for source_id in last])
+        pos = 0
+        while vectors is not None:
+            batch = rows[pos:pos + len(vectors)]
+            cur.executemany(
+                "INSERT INTO vectors (source_id, content, metadata, embedding) VALUES (?, ?, ?, ?)",
+                [(source_id, txt, meta_json, _vector_to_blob(vec))
+                 for (source_id, txt, meta_json), vec in zip(batch, vectors)],
+            )
+            pos += len(vectors)
+            vectors = next(batches, None)
+    return counts
+
+def _embed_batches(texts):
+    """
+    Yield unit vectors for texts, _ENCODE_BATCH at a time and in order.
+    With a model loaded, a single worker thread keeps up to two batches in flight
+    (model.encode releases the GIL), so the caller's work on one batch overlaps
+    encoding of the next. The hash fallback, and anything that fits in one batch,
+    is embedded in a single call with no thread.
+    """
+    if len(texts) <= _ENCODE_BATCH or _get_model() is None:
+        # _embed_texts already returns unit vectors, so queries never recompute their norms
+        yield _embed_texts(texts)
+        return
+    batches = [texts[i:i + _ENCODE_BATCH] for i in range(0, len(texts), _ENCODE_BATCH)]
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        pending = deque(pool.submit(_embed_texts, b) for b in batches[:2])
+        submitted = len(pending)
+        while pending:
+            vectors = pending.popleft().result()
+            if submitted < len(batches):
+                pending.append(pool.submit(_embed_texts, batches[submitted]))
+                submitted += 1
+            yield vectors
 
 def delete_source(source_id: str):
     init_db()
     conn = _connect()
     conn.execute("DELETE FROM vectors WHERE source_id = ?", (source_id,))
     conn.commit()
-    conn.close()
 
-def query(query_text: str, top_k: int = 5):
+def query(query_text: str, top_k: int = 5, use_ann: bool = None):
     """
     Semantic query: compute embedding for query_text and return top_k closest by cosine similarity.
     Returns list of dicts: {score, source_id, content, metadata}
+
+    use_ann=True searches the faiss HNSW index (approximate), False scans every row
+    (exact). The default uses the index once the DB holds ANN_MIN_VECTORS rows.
+    The index needs faiss; without it, or when the index holds another model's
+    dimension, queries scan.
     """
     init_db()
     conn = _connect()
-    cursor = conn.execute("SELECT id, source_id, content, metadata, embedding FROM vectors")
-    rows = cursor.fetchall()
-    conn.close()
-    if not rows:
-        return []
+    if faiss is None:
+        use_ann = False
+    elif use_ann is None:
+        use_ann = count() >= ANN_MIN_VECTORS
 
     query_vec = _embed_texts([query_text])[0]
+    index = _ann_index(conn, len(query_vec)) if use_ann else None
+    if index is not None:
+        scored = _ann_search(index, query_vec, top_k)
+    else:
+        # phase 1: score on embeddings only; content/metadata of losing rows is never read.
+        # Rows embedded by a different model (384-d vs 32-d fallback) can't be compared, so skip them.
+        rows = conn.execute(
+            "SELECT id, embedding FROM vectors WHERE length(embedding) = ?", (4 * len(query_vec),)
+        ).fetchall()
+        if not rows:
+            return []
+        scored = [(score, rows[i][0]) for score, i in _rank(query_vec, [r[1] for r in rows], top_k)]
+    if not scored:
+        return []
 
-    # compute cosine similarity
-    scored = []
-    for _id, source_id, content, metadata_json, emb_blob in rows:
-        emb = _blob_to_vector(emb_blob)
-        # dot / (||a||*||b||)
-        dot = sum(a*b for a,b in zip(query_vec, emb))
-        norm_q = math.sqrt(sum(a*a for a in query_vec)) or 1.0
-        norm_e = math.sqrt(sum(a*a for a in emb)) or 1.0
-        score = dot / (norm_q * norm_e)
-        meta = json.loads(metadata_json) if metadata_json else {}
-        scored.append((score, source_id, content, meta))
-    scored.sort(key=lambda x: x[0], reverse=True)
+    # phase 2: fetch content/metadata for the winners only
+    details = _fetch_details(conn, [_id for _, _id in scored])
     results = []
-    for score, source_id, content, meta in scored[:top_k]:
+    for score, _id in scored:
+        # a row deleted since it was scored is simply skipped
+        if _id not in details:
+            continue
+        source_id, content, metadata_json = details[_id]
+        meta = json.loads(metadata_json) if metadata_json else {}
         results.append({"score": float(score), "source_id": source_id, "content": content, "metadata": meta})
     return results
 
+def _fetch_details(conn, ids):
+    """Return {id: (source_id, content, metadata_json)}, querying in chunks below SQLite's variable limit."""
+    details = {}
+    for start in range(0, len(ids), _SQL_MAX_VARS):
+        chunk = ids[start:start + _SQL_MAX_VARS]
+        placeholders = ",".join("?" * len(chunk))
+        for _id, source_id, content, metadata_json in conn.execute(
+            f"SELECT id, source_id, content, metadata FROM vectors WHERE id IN ({placeholders})", chunk
+        ):
+            details[_id] = (source_id, content, metadata_json)
+    return details
+
+def _ann_index(conn, dim):
+    """
+    Return the HNSW index over the dim-dimensional rows of the vectors table, brought up
+    to date with it, or None when the caller should fall back to the exact scan (no such
+    rows, or a persisted index of another dimension whose rows still exist).
+
+    Entries are keyed by the AUTOINCREMENT row id, so rows added since the last call are
+    appended. HNSW can't remove entries, so once any indexed row has been deleted (every
+    sync() re-ingests its sources) the index is rebuilt from scratch.
+    """
+    global _ANN_INDEX
+    with _ANN_LOCK:
+        index = _ANN_INDEX
+        if index is None and ANN_INDEX_PATH.exists():
+            try:
+                index = faiss.read_index(str(ANN_INDEX_PATH))
+            except RuntimeError:
+                index = None
+        if index is not None and index.d != dim:
+            if conn.execute(
+                "SELECT 1 FROM vectors WHERE length(embedding) = ? LIMIT 1", (4 * index.d,)
+            ).fetchone():
+                # the other model's rows are still live; keep their index and scan this query
+                _ANN_INDEX = index
+                return None
+            index = None
+
+        max_id = 0
+        if index is not None and index.ntotal:
+            max_id = int(faiss.vector_to_array(index.id_map).max())
+            seq = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'vectors'").fetchone()
+            live = conn.execute(
+                "SELECT COUNT(*) FROM vectors WHERE id <= ? AND length(embedding) = ?", (max_id, 4 * dim)
+            ).fetchone()[0]
+            # seq < max_id means the DB was recreated and ids restarted
+            if seq is None or seq[0] < max_id or live != index.ntotal:
+                index, max_id = None, 0
+
+        rows = conn.execute(
+            "SELECT id, embedding FROM vectors WHERE id > ? AND length(embedding) = ?", (max_id, 4 * dim)
+        ).fetchall()
+        if rows:
+            embs = np.frombuffer(b"".join(r[1] for r in rows), dtype=np.float32).reshape(len(rows), dim)
+            if index is None:
+                index = faiss.index_factory(dim, f"IDMap2,HNSW{_ANN_HNSW_M}", faiss.METRIC_INNER_PRODUCT)
+            index.add_with_ids(embs, np.array([r[0] for r in rows], dtype=np.int64))
+            tmp = ANN_INDEX_PATH.with_suffix(".faiss.tmp")
+            faiss.write_index(index, str(tmp))
+            os.replace(tmp, ANN_INDEX_PATH)
+        _ANN_INDEX = index if index is not None and index.ntotal else None
+        return _ANN_INDEX
+
+def _ann_search(index, query_vec, k):
+    """Return [(score, row_id)] of the k nearest index entries, best first."""
+    k = min(k, index.ntotal)
+    q = np.asarray(query_vec, dtype=np.float32).reshape(1, -1)
+    q = q / (np.linalg.norm(q) or 1.0)
+    # efSearch bounds the candidate list, so it must be at least k
+    faiss.downcast_index(index.index).hnsw.efSearch = max(64, k)
+    scores, ids = index.search(q, k)
+    return [(float(score), int(_id)) for score, _id in zip(scores[0], ids[0]) if _id != -1]
+
+def _rank(query_vec, blobs, top_k):
+    """Return [(score, row_index)] of the top_k blobs by cosine similarity, best first."""
+    if np is not None:
+        k = min(top_k, len(blobs))
+        if k <= 0:
+            return []
+        # one (N, D) matrix and a single BLAS mat-vec instead of N Python loops;
+        # rows are normalized at ingest, so only the query needs scaling
+        embs = np.frombuffer(b"".join(blobs), dtype=np.float32).reshape(len(blobs), -1)
+        q = np.asarray(query_vec, dtype=np.float32)
+        q = q / (np.linalg.norm(q) or 1.0)
+        scores = embs @ q
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(float(scores[i]), int(i)) for i in top]
+
+    # pure-Python fallback: dot of unit vectors
+    q = _normalize(query_vec)
+    scored = []
+    for i, blob in enumerate(blobs):
+        emb = _blob_to_vector(blob)
+        scored.append((sum(a*b for a,b in zip(q, emb)), i))
+    scored.sort(key=lambda x: x[0], reverse=True)
+    return scored[:top_k]
+
 def count():
     init_db()
     conn = _connect()
@@ -171,7 +434,6 @@ def count():
         c = conn.execute("SELECT COUNT(*) FROM vectors").fetchone()[0]
     except Exception:
         c = 0
-    conn.close()
     return c
 
 # Provide a CLI entry so we can call vector_store.main() from anyProject if desired
@@ -187,7 +449,12 @@ def main():
         print("vectors:", count())
     elif args.clear:
         if DB_PATH.exists():
+            _close_connections()
             DB_PATH.unlink()
+            # drop WAL side files too so a fresh DB doesn't pick them up
+            for suffix in ("-wal", "-shm"):
+                Path(str(DB_PATH) + suffix).unlink(missing_ok=True)
+            ANN_INDEX_PATH.unlink(missing_ok=True)
             print("vector DB removed")
     elif args.query:
         res = query(args.query)